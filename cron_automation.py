@@ -4,7 +4,10 @@ Cron Job Automation for NBA Data Pipeline
 This script sets up automated data collection and database loading using cron jobs.
 """
 
+import getpass
 import os
+import shlex
+import shutil
 import subprocess
 import sys
 from datetime import datetime
@@ -20,15 +23,21 @@ class CronAutomation:
     def __init__(self):
         self.project_dir = os.path.dirname(os.path.abspath(__file__))
         self.python_path = sys.executable
+        self.systemd_unit_dir = os.path.expanduser('~/.config/systemd/user')
+        self.systemd_unit_name = 'nba-pipeline'
         
     def create_automation_script(self):
         """Create the main automation script."""
+        # Quote once so paths with spaces or shell metacharacters survive the script
+        project_dir = shlex.quote(self.project_dir)
+        python_path = shlex.quote(self.python_path)
+        
         script_content = f'''#!/bin/bash
 # NBA Data Automation Script
 # Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 
 # Set working directory
-cd {self.project_dir}
+cd {project_dir}
 
 # Activate virtual environment if it exists
 if [ -d ".venv" ]; then
@@ -36,7 +45,7 @@ if [ -d ".venv" ]; then
 fi
 
 # Set environment variables
-export PYTHONPATH={self.project_dir}
+export PYTHONPATH={project_dir}
 export AUTO_CONFIRM=true
 
 # Log start time
@@ -79,6 +88,125 @@ echo "$(date): NBA data pipeline completed successfully"
         logger.info(f"✅ Created automation script: {script_path}")
         return script_path
     
+    def setup_systemd_timer(self, on_calendar: str = "*-*-* 06:00:00"):
+        """
+        Set up a systemd user timer for automated data collection.
+        
+        Args:
+            on_calendar: systemd OnCalendar expression (default: daily at 6 AM)
+                         Examples:
+                         - "*-*-* 06:00:00" (daily at 6 AM)
+                         - "*-*-* 00/6:00:00" (every 6 hours)
+                         - "Mon *-*-* 06:00:00" (weekly on Monday at 6 AM)
+        """
+        if not shutil.which('systemctl'):
+            logger.warning("systemctl not available; systemd timer not set up")
+            return False
+        
+        script_path = self.create_automation_script()
+        
+        service_content = f"""[Unit]
+Description=NBA data collection and loading pipeline
+
+[Service]
+Type=oneshot
+WorkingDirectory={self.project_dir}
+ExecStart="{script_path}"
+"""
+        
+        timer_content = f"""[Unit]
+Description=Scheduled NBA data pipeline
+
+[Timer]
+OnCalendar={on_calendar}
+Persistent=true
+
+[Install]
+WantedBy=timers.target
+"""
+        
+        try:
+            # Unit files are static; re-running simply overwrites them
+            os.makedirs(self.systemd_unit_dir, exist_ok=True)
+            with open(os.path.join(self.systemd_unit_dir, f'{self.systemd_unit_name}.service'), 'w') as f:
+                f.write(service_content)
+            with open(os.path.join(self.systemd_unit_dir, f'{self.systemd_unit_name}.timer'), 'w') as f:
+                f.write(timer_content)
+            
+            subprocess.run(
+                f"systemctl --user daemon-reload && systemctl --user enable --now {self.systemd_unit_name}.timer",
+                shell=True,
+                check=True
+            )
+            logger.info("✅ Systemd timer enabled successfully!")
+            logger.info(f"Schedule: {on_calendar}")
+            logger.info(f"Script: {script_path}")
+            return True
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.error(f"❌ Failed to set up systemd timer: {e}")
+            return False
+    
+    def remove_systemd_timer(self):
+        """Remove NBA automation systemd timer."""
+        if not shutil.which('systemctl'):
+            return False
+        
+        try:
+            subprocess.run(
+                ['systemctl', '--user', 'disable', '--now', f'{self.systemd_unit_name}.timer'],
+                capture_output=True
+            )
+            for suffix in ('timer', 'service'):
+                unit_path = os.path.join(self.systemd_unit_dir, f'{self.systemd_unit_name}.{suffix}')
+                if os.path.exists(unit_path):
+                    os.remove(unit_path)
+            subprocess.run(['systemctl', '--user', 'daemon-reload'], check=True)
+            logger.info("✅ NBA automation systemd timer removed")
+            return True
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.error(f"❌ Failed to remove systemd timer: {e}")
+            return False
+    
+    def user_lingering(self):
+        """Ensure systemd keeps this user's manager running without a login session.
+        
+        Without lingering a user timer only fires while the user is logged in. Tries
+        `loginctl enable-linger` when it is off; returns whether lingering is enabled.
+        """
+        if not shutil.which('loginctl'):
+            return False
+        
+        user = getpass.getuser()
+        
+        def linger_enabled():
+            result = subprocess.run(
+                ['loginctl', 'show-user', user, '--property=Linger', '--value'],
+                capture_output=True, text=True
+            )
+            return result.returncode == 0 and result.stdout.strip() == 'yes'
+        
+        if linger_enabled():
+            return True
+        subprocess.run(['loginctl', 'enable-linger', user], capture_output=True)
+        if linger_enabled():
+            logger.info(f"✅ Enabled lingering for {user} so the timer runs without a login session")
+            return True
+        return False
+    
+    def setup_automation(self, on_calendar: str, cron_schedule: str):
+        """Set up automation with a systemd timer, falling back to cron.
+        
+        The timer is only used when user lingering is on; otherwise it would stop firing
+        once the user logs out, so cron is used instead.
+        """
+        if self.user_lingering():
+            if self.setup_systemd_timer(on_calendar):
+                return True
+        else:
+            logger.warning("⚠️  User lingering is off, so a systemd user timer would stop after logout")
+        logger.info("Falling back to cron...")
+        return self.setup_cron_job(cron_schedule)
+    
     def setup_cron_job(self, schedule: str = "0 6 * * *"):
         """
         Set up cron job for automated data collection.
@@ -165,6 +293,20 @@ echo "$(date): NBA data pipeline completed successfully"
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to list cron jobs: {e}")
     
+    def list_systemd_timer(self):
+        """Show the NBA automation systemd timer, if one is installed."""
+        timer_path = os.path.join(self.systemd_unit_dir, f'{self.systemd_unit_name}.timer')
+        if not shutil.which('systemctl') or not os.path.exists(timer_path):
+            logger.info("No NBA automation systemd timer found")
+            return
+        
+        result = subprocess.run(
+            ['systemctl', '--user', 'list-timers', '--all', f'{self.systemd_unit_name}.timer'],
+            capture_output=True, text=True
+        )
+        logger.info("NBA automation systemd timer:")
+        logger.info(result.stdout if result.returncode == 0 else result.stderr)
+    
     def test_automation(self):
         """Test the automation script."""
         script_path = os.path.join(self.project_dir, 'run_nba_pipeline.sh')
@@ -202,17 +344,17 @@ def main():
     print("2. Set up weekly automation (Monday 6 AM)")
     print("3. Set up custom schedule")
     print("4. Test automation script")
-    print("5. List current cron jobs")
+    print("5. List current cron jobs and systemd timer")
     print("6. Remove NBA automation")
     print("7. Exit")
     
     choice = input("\nEnter your choice (1-7): ").strip()
     
     if choice == "1":
-        automation.setup_cron_job("0 6 * * *")
+        automation.setup_automation("*-*-* 06:00:00", "0 6 * * *")
         print("✅ Daily automation set up (6 AM)")
     elif choice == "2":
-        automation.setup_cron_job("0 6 * * 1")
+        automation.setup_automation("Mon *-*-* 06:00:00", "0 6 * * 1")
         print("✅ Weekly automation set up (Monday 6 AM)")
     elif choice == "3":
         schedule = input("Enter cron schedule (e.g., '0 6 * * *' for daily at 6 AM): ").strip()
@@ -223,7 +365,9 @@ def main():
         automation.test_automation()
     elif choice == "5":
         automation.list_cron_jobs()
+        automation.list_systemd_timer()
     elif choice == "6":
+        automation.remove_systemd_timer()
         automation.remove_cron_job()
     elif choice == "7":
         print("Goodbye!")
@@ -5,146 +5,304 @@ This module handles loading CSV data into PostgreSQL database with proper schema
 data validation, and error handling.
 """
 
-import pandas as pd
-import psycopg2
+import csv
+import gzip
+from contextlib import contextmanager
+from itertools import islice
 from psycopg2 import sql
-from sqlalchemy import create_engine, text
 import os
+import sys
 import logging
+import logging.handlers
+import queue
+import atexit
 from datetime import datetime
 from dotenv import load_dotenv
 import glob
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from db import get_conn, get_connection_pool
 
 # Load environment variables
 load_dotenv()
 
-# Set up logging
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that lets a large stream buffer absorb per-record writes.
+    
+    Records are flushed when the buffer fills, on errors, and when the handler closes.
+    """
+    
+    buffer_size = 64 * 1024
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            super().flush()
+    
+    def flush(self):
+        # Skip the per-record flush done by StreamHandler.emit
+        pass
+
+# Set up logging; file writes happen on a listener thread through a buffered handler
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, BufferedFileHandler('nba_loader.log'))
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('nba_loader.log'),
+        logging.handlers.QueueHandler(_log_queue),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Schema and tables, sent to the server as a single statement batch
+SCHEMA_DDL = """
+CREATE SCHEMA IF NOT EXISTS nba;
+
+-- Players table
+CREATE TABLE IF NOT EXISTS nba.players (
+    player_id INTEGER PRIMARY KEY,
+    player_name VARCHAR(100) NOT NULL,
+    team_id INTEGER,
+    team_abbreviation VARCHAR(10),
+    jersey_number VARCHAR(10),
+    position VARCHAR(10),
+    height VARCHAR(10),
+    weight VARCHAR(10),
+    age INTEGER,
+    college VARCHAR(100),
+    country VARCHAR(50),
+    draft_year INTEGER,
+    draft_round INTEGER,
+    draft_number INTEGER,
+    season VARCHAR(10),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Player season stats table
+CREATE TABLE IF NOT EXISTS nba.player_season_stats (
+    id SERIAL PRIMARY KEY,
+    player_id INTEGER NOT NULL,
+    player_name VARCHAR(100) NOT NULL,
+    season VARCHAR(10) NOT NULL,
+    team_id INTEGER,
+    team_abbreviation VARCHAR(10),
+    per_mode VARCHAR(20),
+    games_played INTEGER,
+    games_started INTEGER,
+    minutes_per_game DECIMAL(5,2),
+    field_goals_made DECIMAL(5,2),
+    field_goals_attempted DECIMAL(5,2),
+    field_goal_percentage DECIMAL(5,3),
+    three_pointers_made DECIMAL(5,2),
+    three_pointers_attempted DECIMAL(5,2),
+    three_point_percentage DECIMAL(5,3),
+    free_throws_made DECIMAL(5,2),
+    free_throws_attempted DECIMAL(5,2),
+    free_throw_percentage DECIMAL(5,3),
+    offensive_rebounds DECIMAL(5,2),
+    defensive_rebounds DECIMAL(5,2),
+    total_rebounds DECIMAL(5,2),
+    assists DECIMAL(5,2),
+    steals DECIMAL(5,2),
+    blocks DECIMAL(5,2),
+    turnovers DECIMAL(5,2),
+    personal_fouls DECIMAL(5,2),
+    points DECIMAL(5,2),
+    plus_minus DECIMAL(6,2),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Teams table
+CREATE TABLE IF NOT EXISTS nba.teams (
+    team_id INTEGER PRIMARY KEY,
+    team_name VARCHAR(100) NOT NULL,
+    team_abbreviation VARCHAR(10) NOT NULL,
+    team_city VARCHAR(50),
+    conference VARCHAR(20),
+    division VARCHAR(20),
+    season VARCHAR(10),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Unlogged staging tables: bulk COPY lands here without WAL, then moves over in one transaction
+CREATE UNLOGGED TABLE IF NOT EXISTS nba.players_stage (LIKE nba.players INCLUDING DEFAULTS);
+CREATE UNLOGGED TABLE IF NOT EXISTS nba.player_season_stats_stage (LIKE nba.player_season_stats INCLUDING DEFAULTS);
+CREATE UNLOGGED TABLE IF NOT EXISTS nba.teams_stage (LIKE nba.teams INCLUDING DEFAULTS);
+"""
+
+# Secondary indexes, built after bulk loads rather than maintained row by row during them
+INDEX_DEFINITIONS = {
+    'idx_players_name': 'nba.players(player_name)',
+    'idx_players_season': 'nba.players(season)',
+    'idx_player_stats_player_season': 'nba.player_season_stats(player_id, season)',
+    'idx_player_stats_name': 'nba.player_season_stats(player_name)',
+    'idx_player_stats_season': 'nba.player_season_stats(season)',
+    # Covering partial index matching the season_leaders view's filter and points ordering
+    'idx_player_stats_season_points': (
+        "nba.player_season_stats(season, points DESC) "
+        "INCLUDE (player_name, team_abbreviation, total_rebounds, assists, field_goal_percentage, games_played) "
+        "WHERE per_mode = 'PerGame' AND games_played >= 50"
+    ),
+    'idx_teams_abbreviation': 'nba.teams(team_abbreviation)',
+    'idx_teams_season': 'nba.teams(season)',
+}
+
+INDEX_DDL = "\n".join(
+    f"CREATE INDEX IF NOT EXISTS {name} ON {definition};"
+    for name, definition in INDEX_DEFINITIONS.items()
+)
+
+DROP_INDEX_DDL = "DROP INDEX IF EXISTS {};".format(
+    ", ".join(f"nba.{name}" for name in INDEX_DEFINITIONS)
+)
+
+NBA_TABLES = ['players', 'player_season_stats', 'teams']
+STAGE_SUFFIX = '_stage'
+
+# Applied at the start of each bulk-load transaction. Reruns regenerate the data, so
+# commits need not wait for WAL flush; the extra memory speeds index and view builds.
+LOAD_SESSION_SETTINGS = """
+SET LOCAL synchronous_commit = off;
+SET LOCAL maintenance_work_mem = '1GB';
+SET LOCAL work_mem = '256MB';
+"""
+
+# Bytes handed to COPY per read while streaming a CSV file; override with COPY_BUFFER_SIZE
+COPY_BUFFER_SIZE = int(os.getenv('COPY_BUFFER_SIZE', 64 * 1024))
+
+# Header cleanup: lowercase, spaces and dashes become underscores
+_COLUMN_NAME_TRANSLATION = str.maketrans(' -', '__')
+
+@lru_cache(maxsize=None)
+def normalize_column_name(name: str) -> str:
+    """Normalize a CSV header name to its database column name."""
+    return name.lower().translate(_COLUMN_NAME_TRANSLATION)
+
+def open_for_sequential_read(path: str):
+    """Open a file in binary mode, hinting the kernel to read ahead for a sequential scan."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        # posix_fadvise is unavailable on some platforms (e.g. macOS, Windows)
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        return os.fdopen(fd, 'rb')
+    except Exception:
+        os.close(fd)
+        raise
+
+@contextmanager
+def open_csv_for_copy(path: str):
+    """Open a CSV file for COPY, transparently decompressing .csv.gz files."""
+    with open_for_sequential_read(path) as raw:
+        if path.endswith('.gz'):
+            with gzip.GzipFile(fileobj=raw, mode='rb') as f:
+                yield f
+        else:
+            yield raw
+
+def find_csv_files(directory: str):
+    """List the plain and gzipped CSV files in a directory."""
+    return glob.glob(os.path.join(directory, "*.csv")) + glob.glob(os.path.join(directory, "*.csv.gz"))
+
+# Rows encoded per step when streaming in-memory rows to COPY
+COPY_ROWS_PER_CHUNK = 10000
+
+# Generated seasons buffered between the generator and the background stats COPY
+STATS_QUEUE_SEASONS = 4
+
+# In-memory rows use COPY's text format with a unit-separator delimiter: no quoting state machine,
+# only the few characters text format treats specially need escaping
+COPY_TEXT_DELIMITER = '\x1f'
+_COPY_TEXT_ESCAPES = str.maketrans({'\\': '\\\\', '\n': '\\n', '\r': '\\r', COPY_TEXT_DELIMITER: '\\x1f'})
+
+def _copy_text_value(value) -> str:
+    """Encode one value for COPY text format; None becomes the \\N NULL marker."""
+    if value is None:
+        return '\\N'
+    return str(value).translate(_COPY_TEXT_ESCAPES)
+
+class CopyTextRowStream:
+    """Read-only file object that encodes row batches lazily, in COPY text format, as COPY reads from it.
+    
+    Each read encodes at most one new batch, so a batch is handed to COPY as soon as it is available.
+    """
+    
+    def __init__(self, batches):
+        self._batches = iter(batches)
+        self._pending = ''
+    
+    @staticmethod
+    def _encode(batch) -> str:
+        return ''.join(COPY_TEXT_DELIMITER.join(map(_copy_text_value, row)) + '\n' for row in batch)
+    
+    def read(self, size: int = -1) -> str:
+        if size < 0:
+            data, self._pending = self._pending + ''.join(map(self._encode, self._batches)), ''
+            return data
+        
+        # An empty result ends the COPY, so skip past empty batches
+        while not self._pending:
+            batch = next(self._batches, None)
+            if batch is None:
+                break
+            self._pending = self._encode(batch)
+        
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+def chunk_rows(rows, size: int = COPY_ROWS_PER_CHUNK):
+    """Split an iterable of rows into lists of up to size rows."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
 class NBADatabaseLoader:
     """Handles loading NBA CSV data into PostgreSQL database."""
     
     def __init__(self):
         self.connection_string = os.getenv('DATABASE_URL')
-        self.engine = create_engine(self.connection_string)
+        # Single pooled connection for schema, publish and verification work
         self.conn = None
         
     def connect(self):
         """Establish database connection."""
         try:
-            self.conn = psycopg2.connect(self.connection_string)
+            if self.conn is None:
+                self.conn = get_connection_pool(self.connection_string).getconn()
             logger.info("✅ Database connection established")
             return True
         except Exception as e:
             logger.error(f"❌ Database connection failed: {e}")
             return False
     
+    def close(self):
+        """Return the database connection to the pool."""
+        if self.conn is not None:
+            get_connection_pool(self.connection_string).putconn(self.conn)
+            self.conn = None
+    
     def create_schema(self):
-        """Create database schema for NBA data."""
+        """Create database schema and tables for NBA data."""
         if not self.conn:
             logger.error("No database connection")
             return False
         
         try:
             cursor = self.conn.cursor()
-            
-            # Create schema if it doesn't exist
-            cursor.execute("CREATE SCHEMA IF NOT EXISTS nba;")
-            
-            # Players table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS nba.players (
-                    player_id INTEGER PRIMARY KEY,
-                    player_name VARCHAR(100) NOT NULL,
-                    team_id INTEGER,
-                    team_abbreviation VARCHAR(10),
-                    jersey_number VARCHAR(10),
-                    position VARCHAR(10),
-                    height VARCHAR(10),
-                    weight VARCHAR(10),
-                    age INTEGER,
-                    college VARCHAR(100),
-                    country VARCHAR(50),
-                    draft_year INTEGER,
-                    draft_round INTEGER,
-                    draft_number INTEGER,
-                    season VARCHAR(10),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            
-            # Player season stats table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS nba.player_season_stats (
-                    id SERIAL PRIMARY KEY,
-                    player_id INTEGER NOT NULL,
-                    player_name VARCHAR(100) NOT NULL,
-                    season VARCHAR(10) NOT NULL,
-                    team_id INTEGER,
-                    team_abbreviation VARCHAR(10),
-                    per_mode VARCHAR(20),
-                    games_played INTEGER,
-                    games_started INTEGER,
-                    minutes_per_game DECIMAL(5,2),
-                    field_goals_made DECIMAL(5,2),
-                    field_goals_attempted DECIMAL(5,2),
-                    field_goal_percentage DECIMAL(5,3),
-                    three_pointers_made DECIMAL(5,2),
-                    three_pointers_attempted DECIMAL(5,2),
-                    three_point_percentage DECIMAL(5,3),
-                    free_throws_made DECIMAL(5,2),
-                    free_throws_attempted DECIMAL(5,2),
-                    free_throw_percentage DECIMAL(5,3),
-                    offensive_rebounds DECIMAL(5,2),
-                    defensive_rebounds DECIMAL(5,2),
-                    total_rebounds DECIMAL(5,2),
-                    assists DECIMAL(5,2),
-                    steals DECIMAL(5,2),
-                    blocks DECIMAL(5,2),
-                    turnovers DECIMAL(5,2),
-                    personal_fouls DECIMAL(5,2),
-                    points DECIMAL(5,2),
-                    plus_minus DECIMAL(6,2),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            
-            # Teams table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS nba.teams (
-                    team_id INTEGER PRIMARY KEY,
-                    team_name VARCHAR(100) NOT NULL,
-                    team_abbreviation VARCHAR(10) NOT NULL,
-                    team_city VARCHAR(50),
-                    conference VARCHAR(20),
-                    division VARCHAR(20),
-                    season VARCHAR(10),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            
-            # Create indexes for better performance
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_players_name ON nba.players(player_name);
-                CREATE INDEX IF NOT EXISTS idx_players_season ON nba.players(season);
-                CREATE INDEX IF NOT EXISTS idx_player_stats_player_season ON nba.player_season_stats(player_id, season);
-                CREATE INDEX IF NOT EXISTS idx_player_stats_name ON nba.player_season_stats(player_name);
-                CREATE INDEX IF NOT EXISTS idx_player_stats_season ON nba.player_season_stats(season);
-                CREATE INDEX IF NOT EXISTS idx_teams_abbreviation ON nba.teams(team_abbreviation);
-                CREATE INDEX IF NOT EXISTS idx_teams_season ON nba.teams(season);
-            """)
-            
+            cursor.execute(SCHEMA_DDL)
             self.conn.commit()
             cursor.close()
             logger.info("✅ Database schema created successfully")
@@ -156,39 +314,130 @@ class NBADatabaseLoader:
                 self.conn.rollback()
             return False
     
-    def load_csv_to_table(self, csv_file: str, table_name: str, schema: str = 'nba'):
-        """Load CSV file into PostgreSQL table."""
+    def create_indexes(self):
+        """Create secondary indexes on the NBA tables."""
+        if not self.conn:
+            logger.error("No database connection")
+            return False
+        
         try:
-            logger.info(f"Loading {csv_file} into {schema}.{table_name}...")
+            cursor = self.conn.cursor()
+            cursor.execute(LOAD_SESSION_SETTINGS)
+            cursor.execute(INDEX_DDL)
+            self.conn.commit()
+            cursor.close()
+            logger.info("✅ Database indexes created successfully")
+            return True
             
-            # Read CSV file
-            df = pd.read_csv(csv_file)
-            logger.info(f"Read {len(df)} records from {csv_file}")
+        except Exception as e:
+            logger.error(f"❌ Error creating indexes: {e}")
+            if self.conn:
+                self.conn.rollback()
+            return False
+    
+    def analyze_tables(self):
+        """Collect planner statistics for all NBA tables in one statement, once loading is done."""
+        if not self.conn:
+            logger.error("No database connection")
+            return False
+        
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(sql.SQL("ANALYZE {};").format(
+                sql.SQL(", ").join(sql.Identifier('nba', table) for table in NBA_TABLES)
+            ))
+            self.conn.commit()
+            cursor.close()
+            logger.info("✅ Table statistics updated")
+            return True
             
-            if df.empty:
-                logger.warning(f"No data in {csv_file}")
-                return True
+        except Exception as e:
+            logger.error(f"❌ Error analyzing tables: {e}")
+            if self.conn:
+                self.conn.rollback()
+            return False
+    
+    def load_csv_to_table(self, csv_file: str, table_name: str, schema: str = 'nba', conn=None):
+        """Stream CSV file (optionally gzipped) into PostgreSQL table using COPY."""
+        conn = conn or self.conn
+        try:
+            logger.info(f"Loading {csv_file} into {schema}.{table_name}...")
             
-            # Clean column names
-            df.columns = [col.lower().replace(' ', '_').replace('-', '_') for col in df.columns]
+            with open_csv_for_copy(csv_file) as f:
+                # Clean column names from the header; COPY streams the remaining bytes untouched
+                header = next(csv.reader([f.readline().decode('utf-8-sig')]), [])
+                columns = [normalize_column_name(col) for col in header]
+                
+                if not columns:
+                    logger.warning(f"No data in {csv_file}")
+                    return True
+                
+                # Unquoted empty fields are already NULL in CSV format; FORCE_NULL covers quoted ones
+                column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+                copy_sql = sql.SQL(
+                    "COPY {}.{} ({}) FROM STDIN WITH (FORMAT CSV, FORCE_NULL ({}))"
+                ).format(sql.Identifier(schema), sql.Identifier(table_name), column_list, column_list)
+                
+                cursor = conn.cursor()
+                cursor.execute(LOAD_SESSION_SETTINGS)
+                cursor.copy_expert(copy_sql.as_string(conn), f, size=COPY_BUFFER_SIZE)
+                row_count = cursor.rowcount
+                conn.commit()
+                cursor.close()
             
-            # Handle NaN values
-            df = df.fillna('')
+            logger.info(f"✅ Successfully loaded {row_count:,} records into {schema}.{table_name}")
+            return True
             
-            # Load data using pandas to_sql
-            df.to_sql(
-                table_name,
-                self.engine,
-                schema=schema,
-                if_exists='append',
-                index=False
-            )
+        except Exception as e:
+            logger.error(f"❌ Error loading {csv_file}: {e}")
+            if conn:
+                conn.rollback()
+            return False
+    
+    def copy_rows(self, rows, columns, table_name: str, schema: str = 'nba', conn=None):
+        """Stream in-memory rows into a PostgreSQL table using COPY, without a file on disk."""
+        return self.copy_row_batches(chunk_rows(rows), columns, table_name, schema, conn)
+    
+    def copy_row_batches(self, batches, columns, table_name: str, schema: str = 'nba', conn=None):
+        """Stream batches of in-memory rows into a PostgreSQL table using one COPY.
+        
+        Each batch is encoded and sent as soon as it is produced, so batches can come from a
+        generator that is still running.
+        """
+        conn = conn or self.conn
+        try:
+            column_list = sql.SQL(', ').join(sql.Identifier(normalize_column_name(col)) for col in columns)
+            copy_sql = sql.SQL(
+                "COPY {}.{} ({}) FROM STDIN WITH (FORMAT text, DELIMITER {})"
+            ).format(sql.Identifier(schema), sql.Identifier(table_name), column_list, sql.Literal(COPY_TEXT_DELIMITER))
             
-            logger.info(f"✅ Successfully loaded {len(df)} records into {schema}.{table_name}")
+            cursor = conn.cursor()
+            cursor.execute(LOAD_SESSION_SETTINGS)
+            cursor.copy_expert(copy_sql.as_string(conn), CopyTextRowStream(batches), size=COPY_BUFFER_SIZE)
+            row_count = cursor.rowcount
+            conn.commit()
+            cursor.close()
+            
+            logger.info(f"✅ Streamed {row_count:,} records into {schema}.{table_name}")
             return True
             
         except Exception as e:
-            logger.error(f"❌ Error loading {csv_file}: {e}")
+            logger.error(f"❌ Error streaming into {schema}.{table_name}: {e}")
+            if conn:
+                conn.rollback()
+            return False
+    
+    def copy_from_dataframe(self, df, table_name: str, schema: str = 'nba', conn=None):
+        """Stream a DataFrame's rows into a PostgreSQL table using COPY."""
+        return self.copy_rows(df.itertuples(index=False, name=None), list(df.columns), table_name, schema, conn)
+    
+    def _load_one(self, csv_file: str, table_name: str):
+        """Load a single CSV file on its own pooled connection (safe to run in a worker thread)."""
+        try:
+            with get_conn(self.connection_string) as conn:
+                return self.load_csv_to_table(csv_file, table_name, conn=conn)
+        except Exception as e:
+            logger.error(f"❌ Database connection failed for {csv_file}: {e}")
             return False
     
     def clear_table(self, table_name: str, schema: str = 'nba'):
@@ -204,90 +453,266 @@ class NBADatabaseLoader:
             logger.error(f"❌ Error clearing {schema}.{table_name}: {e}")
             return False
     
-    def load_all_data(self, data_directory: str = 'data', clear_existing: bool = True):
-        """Load all NBA data from CSV files."""
+    def clear_staging_tables(self, schema: str = 'nba'):
+        """Empty all staging tables in a single statement."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(sql.SQL("TRUNCATE TABLE {};").format(
+                sql.SQL(', ').join(sql.Identifier(schema, table + STAGE_SUFFIX) for table in NBA_TABLES)
+            ))
+            self.conn.commit()
+            cursor.close()
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error clearing staging tables: {e}")
+            self.conn.rollback()
+            return False
+    
+    def publish_staged_data(self, clear_existing: bool = True, schema: str = 'nba'):
+        """Move staged rows into the live tables in a single transaction."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(LOAD_SESSION_SETTINGS)
+            
+            if clear_existing:
+                # Indexes are rebuilt by create_indexes once the new rows are in place
+                cursor.execute(DROP_INDEX_DDL)
+                cursor.execute(sql.SQL("TRUNCATE TABLE {} CASCADE;").format(
+                    sql.SQL(', ').join(sql.Identifier(schema, table) for table in NBA_TABLES)
+                ))
+            
+            for table in NBA_TABLES:
+                cursor.execute(sql.SQL("INSERT INTO {} SELECT * FROM {};").format(
+                    sql.Identifier(schema, table),
+                    sql.Identifier(schema, table + STAGE_SUFFIX)
+                ))
+            
+            cursor.execute(sql.SQL("TRUNCATE TABLE {};").format(
+                sql.SQL(', ').join(sql.Identifier(schema, table + STAGE_SUFFIX) for table in NBA_TABLES)
+            ))
+            
+            self.conn.commit()
+            cursor.close()
+            logger.info("✅ Published staged data to live tables")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error publishing staged data: {e}")
+            self.conn.rollback()
+            return False
+    
+    def load_all_data(self, data_directory: str = 'data', csv_files=None, clear_existing: bool = True):
+        """Load all NBA data from CSV files.
+        
+        Args:
+            data_directory: Directory containing the CSV files
+            csv_files: Paths already found in data_directory; globbed when not provided
+            clear_existing: Replace existing rows instead of appending
+        """
         if not self.connect():
             return False
         
         try:
-            # Create schema
+            # Create schema (indexes are built after loading)
             if not self.create_schema():
                 return False
             
             # Define file mappings
             file_mappings = {
                 'players_all_seasons.csv': 'players',
-                'player_stats_per_game.csv': 'player_season_stats',
-                'player_stats_totals.csv': 'player_season_stats',
-                'player_stats_per_36.csv': 'player_season_stats',
+                'player_season_stats.csv': 'player_season_stats',
                 'teams_all_seasons.csv': 'teams'
             }
             
-            # Clear existing data if requested
-            if clear_existing:
-                logger.info("Clearing existing data...")
-                for table in ['players', 'player_season_stats', 'teams']:
-                    self.clear_table(table)
+            # Start from empty staging tables; live tables are only touched once every file is staged
+            if not self.clear_staging_tables():
+                return False
             
-            # Load each file
-            success_count = 0
-            total_files = 0
+            if csv_files is None:
+                csv_files = find_csv_files(data_directory)
+            csv_files = set(csv_files)
             
+            # Load each file concurrently; every worker streams its own COPY
+            files_to_load = []
             for filename, table_name in file_mappings.items():
                 file_path = os.path.join(data_directory, filename)
                 
-                if os.path.exists(file_path):
-                    total_files += 1
-                    if self.load_csv_to_table(file_path, table_name):
-                        success_count += 1
+                if file_path in csv_files:
+                    files_to_load.append((file_path, table_name))
+                elif f"{file_path}.gz" in csv_files:
+                    files_to_load.append((f"{file_path}.gz", table_name))
                 else:
                     logger.warning(f"File not found: {file_path}")
             
+            total_files = len(files_to_load)
+            if not files_to_load:
+                logger.error(f"❌ No known CSV files in '{data_directory}'; live tables left unchanged")
+                return False
+            
+            with ThreadPoolExecutor(max_workers=total_files) as executor:
+                futures = [
+                    executor.submit(self._load_one, file_path, table_name + STAGE_SUFFIX)
+                    for file_path, table_name in files_to_load
+                ]
+                success_count = sum(future.result() for future in futures)
+            
             logger.info(f"✅ Loaded {success_count}/{total_files} files successfully")
             
-            # Get final counts
-            self.get_table_counts()
+            if success_count != total_files:
+                logger.error("❌ Not all files were staged; live tables left unchanged")
+                return False
             
-            return success_count == total_files
+            return self._publish_and_finalize(clear_existing)
             
         except Exception as e:
             logger.error(f"❌ Error in load_all_data: {e}")
             return False
         finally:
-            if self.conn:
-                self.conn.close()
+            self.close()
+    
+    def load_generated_data(self, ingester, clear_existing: bool = True, max_workers: int = 1):
+        """Generate NBA data in-process and stream it straight into PostgreSQL, skipping CSV files.
+        
+        Stats flow through a bounded queue into a single COPY on a background thread, so seasons
+        are sent while later ones are still being generated and only a few are held in memory.
+        Teams and players follow once generation finishes, then everything is published as in
+        load_all_data.
+        """
+        if not self.connect():
+            return False
+        
+        try:
+            if not (self.create_schema() and self.clear_staging_tables()):
+                return False
+            
+            season_queue = queue.Queue(maxsize=STATS_QUEUE_SEASONS)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                stats_staged = executor.submit(
+                    self._copy_season_queue, season_queue, 'player_season_stats' + STAGE_SUFFIX
+                )
+                try:
+                    teams_df, players_df, _ = ingester.generate_comprehensive_data(
+                        stats_sink=season_queue.put, max_workers=max_workers
+                    )
+                finally:
+                    season_queue.put(None)
+            
+            if not stats_staged.result() or not (
+                self.copy_from_dataframe(teams_df, 'teams' + STAGE_SUFFIX)
+                and self.copy_from_dataframe(players_df, 'players' + STAGE_SUFFIX)
+            ):
+                logger.error("❌ Not all data was staged; live tables left unchanged")
+                return False
+            
+            return self._publish_and_finalize(clear_existing)
+            
+        except Exception as e:
+            logger.error(f"❌ Error in load_generated_data: {e}")
+            return False
+        finally:
+            self.close()
+    
+    def _copy_season_queue(self, season_queue: queue.Queue, table_name: str):
+        """COPY queued season stats columns into a table until a None sentinel arrives.
+        
+        Runs on its own pooled connection; after a failure the queue is still drained so the
+        producer never blocks on it.
+        """
+        first = season_queue.get()
+        if first is None:
+            return True
+        
+        finished = False
+        
+        def season_batches():
+            # One batch per season, so each reaches COPY before the next is taken off the queue
+            nonlocal finished
+            columns = first
+            while columns is not None:
+                yield list(zip(*columns.values()))
+                columns = season_queue.get()
+            finished = True
+        
+        try:
+            with get_conn(self.connection_string) as conn:
+                return self.copy_row_batches(season_batches(), list(first), table_name, conn=conn)
+        except Exception as e:
+            logger.error(f"❌ Error streaming into nba.{table_name}: {e}")
+            return False
+        finally:
+            while not finished:
+                finished = season_queue.get() is None
+    
+    def _publish_and_finalize(self, clear_existing: bool):
+        """Publish the staged rows, then rebuild indexes and views and log the final counts."""
+        if clear_existing:
+            logger.info("Replacing existing data...")
+        if not self.publish_staged_data(clear_existing):
+            return False
+        
+        if not self.create_indexes():
+            return False
+        
+        # Statistics are gathered once on the complete data, so the view refreshes plan against it
+        if not self.analyze_tables():
+            return False
+        
+        # Aggregations are computed once per load instead of on every query
+        if not (self.create_views() and self.refresh_views()):
+            return False
+        
+        # Get final counts
+        self.get_table_counts()
+        
+        return True
     
     def get_table_counts(self):
         """Get record counts for all tables."""
         try:
             cursor = self.conn.cursor()
             
-            tables = ['players', 'player_season_stats', 'teams']
+            # One roundtrip for every table's count
+            cursor.execute(sql.SQL(" UNION ALL ").join(
+                sql.SQL("SELECT {}, COUNT(*) FROM {}").format(sql.Literal(table), sql.Identifier('nba', table))
+                for table in NBA_TABLES
+            ))
             
             logger.info("\n📊 Table Record Counts:")
             logger.info("-" * 40)
             
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM nba.{table};")
-                count = cursor.fetchone()[0]
+            for table, count in cursor.fetchall():
                 logger.info(f"{table:20}: {count:,} records")
             
             cursor.close()
+            return True
             
         except Exception as e:
             logger.error(f"Error getting table counts: {e}")
+            return False
     
     def create_views(self):
-        """Create useful database views."""
+        """Create useful materialized views (populated by refresh_views)."""
         if not self.conn:
             return False
         
         try:
             cursor = self.conn.cursor()
             
+            # Replace plain views left by earlier versions of the loader
+            cursor.execute("""
+                DO $$
+                BEGIN
+                    IF EXISTS (SELECT 1 FROM pg_views WHERE schemaname = 'nba' AND viewname = 'player_career_stats') THEN
+                        DROP VIEW nba.player_career_stats;
+                    END IF;
+                    IF EXISTS (SELECT 1 FROM pg_views WHERE schemaname = 'nba' AND viewname = 'season_leaders') THEN
+                        DROP VIEW nba.season_leaders;
+                    END IF;
+                END $$;
+            """)
+            
             # View for player career stats
             cursor.execute("""
-                CREATE OR REPLACE VIEW nba.player_career_stats AS
+                CREATE MATERIALIZED VIEW IF NOT EXISTS nba.player_career_stats AS
                 SELECT 
                     player_id,
                     player_name,
@@ -305,12 +730,17 @@ class NBADatabaseLoader:
                 FROM nba.player_season_stats
                 WHERE per_mode = 'PerGame'
                 GROUP BY player_id, player_name
-                ORDER BY total_points DESC;
+                ORDER BY total_points DESC
+                WITH NO DATA;
+                
+                -- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_player_career_stats_player_id
+                    ON nba.player_career_stats(player_id);
             """)
             
             # View for season leaders
             cursor.execute("""
-                CREATE OR REPLACE VIEW nba.season_leaders AS
+                CREATE MATERIALIZED VIEW IF NOT EXISTS nba.season_leaders AS
                 SELECT 
                     season,
                     player_name,
@@ -324,7 +754,8 @@ class NBADatabaseLoader:
                     ROW_NUMBER() OVER (PARTITION BY season ORDER BY assists DESC) as assists_rank
                 FROM nba.player_season_stats
                 WHERE per_mode = 'PerGame' AND games_played >= 50
-                ORDER BY season, points DESC;
+                ORDER BY season, points DESC
+                WITH NO DATA;
             """)
             
             self.conn.commit()
@@ -334,6 +765,37 @@ class NBADatabaseLoader:
             
         except Exception as e:
             logger.error(f"❌ Error creating views: {e}")
+            self.conn.rollback()
+            return False
+    
+    def refresh_views(self):
+        """Recompute materialized views from the current table data."""
+        if not self.conn:
+            return False
+        
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(LOAD_SESSION_SETTINGS)
+            cursor.execute("SELECT matviewname, ispopulated FROM pg_matviews WHERE schemaname = 'nba';")
+            populated = dict(cursor.fetchall())
+            
+            # CONCURRENTLY keeps the view readable during refresh, but needs a unique index
+            # and existing data; season_leaders has no natural unique key.
+            for view in ['player_career_stats', 'season_leaders']:
+                concurrently = view == 'player_career_stats' and populated.get(view, False)
+                cursor.execute(sql.SQL("REFRESH MATERIALIZED VIEW {}{};").format(
+                    sql.SQL("CONCURRENTLY ") if concurrently else sql.SQL(""),
+                    sql.Identifier('nba', view)
+                ))
+            
+            self.conn.commit()
+            cursor.close()
+            logger.info("✅ Database views refreshed successfully")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Error refreshing views: {e}")
+            self.conn.rollback()
             return False
 
 def main():
@@ -343,32 +805,29 @@ def main():
     
     loader = NBADatabaseLoader()
     
-    # Check if data directory exists
-    data_dir = 'data'
+    # Load from the directory given on the command line, else the postgres_ready copies
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join('data', 'postgres_ready')
     if not os.path.exists(data_dir):
         logger.error(f"Data directory '{data_dir}' not found. Please run nba_ingest.py first.")
-        return
+        return False
     
     # Check for CSV files
-    csv_files = glob.glob(os.path.join(data_dir, "*.csv"))
+    csv_files = find_csv_files(data_dir)
     if not csv_files:
         logger.error(f"No CSV files found in '{data_dir}'. Please run nba_ingest.py first.")
-        return
+        return False
     
     logger.info(f"Found {len(csv_files)} CSV files to load")
     
     # Load all data
-    success = loader.load_all_data(data_dir, clear_existing=True)
+    success = loader.load_all_data(data_dir, csv_files, clear_existing=True)
     
     if success:
         logger.info("🎉 All data loaded successfully!")
-        
-        # Create views
-        if loader.connect():
-            loader.create_views()
-            loader.conn.close()
     else:
         logger.error("❌ Some errors occurred during data loading. Check the logs for details.")
+    
+    return success
 
 if __name__ == "__main__":
-    main()
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,36 @@
+"""
+Shared PostgreSQL Connection Pool
+
+One process-wide pool used by the database loader, its COPY workers and the
+pipeline's verification step, so each connection's handshake is paid only once.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from psycopg2.pool import ThreadedConnectionPool
+
+POOL_MIN_CONNECTIONS = 1
+POOL_MAX_CONNECTIONS = 8
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+def get_connection_pool(connection_string: str = None) -> ThreadedConnectionPool:
+    """Return the shared connection pool, creating it on first use (from DATABASE_URL by default)."""
+    global _connection_pool
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            _connection_pool = ThreadedConnectionPool(
+                POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, connection_string or os.getenv('DATABASE_URL')
+            )
+        return _connection_pool
+
+@contextmanager
+def get_conn(connection_string: str = None):
+    """Borrow a pooled connection for the duration of a with block."""
+    pool = get_connection_pool(connection_string)
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
@@ -9,24 +9,173 @@ This module generates comprehensive NBA data from 1980 to 2025, including:
 
 import pandas as pd
 import numpy as np
-import random
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import gzip
+import hashlib
 import logging
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+import pickle
+import shutil
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from output_cache import cache_dir, env_settings, output_manifest_path, outputs_up_to_date, source_hash, write_output_manifest
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Stat generation lookup tables, indexed by the integer codes below
+POSITION_CODES = {'PG': 0, 'SG': 1, 'SF': 2, 'PF': 3, 'C': 4}
+ERA_CODES = {'1980s': 0, '1990s': 1, '2000s': 2, '2010s': 3, '2020s': 4, 'regular': 5}
+
+# Base stats by position (PG, SG, SF, PF, C)
+BASE_POINTS = np.array([12, 14, 13, 12, 11], dtype=float)
+BASE_ASSISTS = np.array([6, 3, 3, 2, 1], dtype=float)
+BASE_REBOUNDS = np.array([3, 4, 5, 7, 8], dtype=float)
+BASE_STEALS = np.array([1.2, 1.0, 1.1, 1.0, 1.0])
+BASE_BLOCKS = np.array([0.5, 0.5, 0.5, 0.8, 1.2])
+LISTED_BLOCKS = np.array([0.0, 0.0, 0.0, 0.8, 1.2])  # Only PF/C have a blocks base of their own
+
+# Era multipliers (1980s, 1990s, 2000s, 2010s, 2020s, regular)
+ERA_POINTS = np.array([0.9, 1.0, 1.0, 1.1, 1.2, 1.0])
+ERA_ASSISTS = np.array([1.1, 1.0, 1.0, 1.0, 1.1, 1.0])
+ERA_REBOUNDS = np.array([1.0, 1.0, 1.0, 0.95, 0.9, 1.0])
+ERA_THREE_PCT = np.array([0.3, 0.4, 0.5, 0.7, 0.8, 0.5])
+
+# Superstar tiers: 1 = scorers, 2 = playmakers, 3 = dominant bigs, 4 = rebounding specialists
+SUPERSTAR_TIERS = {
+    **dict.fromkeys(['Michael Jordan', 'LeBron James', 'Kobe Bryant', 'Kevin Durant', 'Giannis Antetokounmpo', 'Luka Doncic'], 1),
+    **dict.fromkeys(['Magic Johnson', 'Stephen Curry', 'Damian Lillard', 'Trae Young'], 2),
+    **dict.fromkeys(['Shaquille O\'Neal', 'Hakeem Olajuwon', 'David Robinson', 'Nikola Jokic', 'Joel Embiid'], 3),
+    **dict.fromkeys(['Dennis Rodman', 'Ben Wallace'], 4),
+}
+TIER_POINTS = np.array([1.0, 2.0, 1.7, 1.5, 0.7])
+TIER_ASSISTS = np.array([1.0, 1.5, 2.0, 1.0, 1.0])
+TIER_REBOUNDS = np.array([1.0, 1.3, 1.0, 1.6, 2.5])
+
+# Pools for randomly generated player attributes
+_FIRST_NAMES = ('Alex', 'Marcus', 'Devin', 'Tyler', 'Jordan', 'Mason', 'Logan', 'Ethan', 'Noah', 'Liam',
+                'James', 'Michael', 'David', 'Chris', 'Kevin')
+_LAST_NAMES = ('Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+               'Wilson', 'Smith', 'Anderson', 'Taylor', 'Thomas', 'Jackson')
+_POSITIONS = ('PG', 'SG', 'SF', 'PF', 'C')
+_COLLEGES = ('Duke', 'Kentucky', 'North Carolina', 'UCLA', 'Kansas', 'Michigan State')
+_COUNTRIES = ('USA', 'Canada', 'France', 'Germany', 'Australia', 'Spain')
+_FIRST_NAMES_ARRAY = np.array(_FIRST_NAMES)
+_LAST_NAMES_ARRAY = np.array(_LAST_NAMES)
+
+# Output columns, accumulated as one list per column while generating
+TEAM_COLUMNS = ['team_id', 'team_name', 'team_abbreviation', 'team_city', 'conference', 'division', 'season']
+PLAYER_COLUMNS = ['player_id', 'player_name', 'team_id', 'team_abbreviation', 'jersey_number', 'position',
+                  'height', 'weight', 'age', 'college', 'country', 'draft_year', 'draft_round',
+                  'draft_number', 'season']
+
+# Files written to data/ by save_data/StatsFileWriter, recorded in the output cache manifest
+# along with the postgres_ready copies of POSTGRES_READY_FILES
+OUTPUT_FILES = (
+    'data/teams_all_seasons.csv', 'data/players_all_seasons.csv', 'data/player_season_stats.csv',
+    'data/teams_all_seasons.parquet', 'data/players_all_seasons.parquet', 'data/player_season_stats.parquet',
+)
+POSTGRES_READY_FILES = ('teams_all_seasons.csv', 'players_all_seasons.csv', 'player_season_stats.csv')
+
+# Low-cardinality string columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ('conference', 'division', 'position', 'team_abbreviation', 'per_mode')
+
+# Stats rows buffered per Parquet row group; a season is only ~70 rows, and tiny row groups
+# make the file larger than the CSV
+PARQUET_ROW_GROUP_ROWS = 128 * 1024
+
+class SeasonData(NamedTuple):
+    """One season's generated output, as per-column lists."""
+    teams: Dict[str, List]
+    players: Dict[str, List]
+    stats: Dict[str, List]
+
+def _append_row(columns: Dict[str, List], **values):
+    """Append one record to a dict of per-column lists."""
+    for name, value in values.items():
+        columns[name].append(value)
+
+def _categorize(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the frame's low-cardinality string columns to categoricals in place."""
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+class StatsFileWriter:
+    """Write per-season stats batches straight to CSV and Parquet as they are generated."""
+    
+    def __init__(self, base_path: str):
+        self.csv_path = f"{base_path}.csv"
+        self.parquet_path = f"{base_path}.parquet"
+        self.rows_written = 0
+        self._csv_file = open(self.csv_path, 'wb')
+        self._csv_writer = None
+        self._schema = None
+        self._parquet_writer = None
+        self._parquet_batches = []
+        self._parquet_rows = 0
+    
+    def write_season(self, columns: Dict[str, List]):
+        """Append one season's stats columns to both files, through the same Arrow table."""
+        table = pa.Table.from_pydict(columns, schema=self._schema)
+        if self._csv_writer is None:
+            # Later seasons reuse the first season's inferred schema
+            self._schema = table.schema
+            self._csv_writer = pa_csv.CSVWriter(self._csv_file, self._schema)
+        self._csv_writer.write_table(table)
+        self.rows_written += table.num_rows
+        
+        self._parquet_batches.append(table)
+        self._parquet_rows += table.num_rows
+        if self._parquet_rows >= PARQUET_ROW_GROUP_ROWS:
+            self._flush_parquet()
+    
+    def _flush_parquet(self):
+        """Write the buffered seasons to the Parquet file as one row group."""
+        if not self._parquet_batches:
+            return
+        table = pa.concat_tables(self._parquet_batches)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.parquet_path, table.schema, compression='snappy')
+        self._parquet_writer.write_table(table, row_group_size=PARQUET_ROW_GROUP_ROWS)
+        self._parquet_batches = []
+        self._parquet_rows = 0
+    
+    def close(self):
+        if self._csv_writer is not None:
+            self._csv_writer.close()
+        self._csv_file.close()
+        self._flush_parquet()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
 class ComprehensiveNBAIngester:
     """Comprehensive NBA data ingester for historical and current data (1980-2025)."""
     
-    def __init__(self, start_year: int = 1980, end_year: int = 2025):
+    def __init__(self, start_year: int = 1980, end_year: int = 2025, seed: Optional[int] = None,
+                 season_cache_dir: Optional[str] = None):
         self.start_year = start_year
         self.end_year = end_year
         self.seasons = [f"{year}-{str(year+1)[2:]}" for year in range(start_year, end_year + 1)]
         
+        # Seeds the per-season PCG64 generators; pass a seed for reproducible runs
+        self.seed = seed
+        
+        # Seeded seasons are pure functions of (seed, season, code), so they can be memoized on disk
+        # and reused by later runs over overlapping year ranges
+        self.season_cache_dir = season_cache_dir if seed is not None else None
+        
         # Create data directory
         os.makedirs('data', exist_ok=True)
     
@@ -93,6 +242,10 @@ class ComprehensiveNBAIngester:
             'WAS': {'name': 'Washington Wizards', 'city': 'Washington', 'conference': 'Eastern', 'division': 'Southeast'},
         }
         
+        # Team abbreviations per era, built once for the per-season team draws
+        self._historical_abbrevs = tuple(self.historical_teams.keys())
+        self._modern_abbrevs = tuple(self.modern_teams.keys())
+        
         # Legendary players by era
         self.legendary_players = {
             '1980s': [
@@ -154,6 +307,46 @@ class ComprehensiveNBAIngester:
                 {'name': 'Jimmy Butler', 'position': 'SF', 'teams': ['MIA'], 'era': '2020s'},
             ]
         }
+        
+        # Career timelines for players who changed teams: the last year spent with each
+        # team, paired with the teams in order (the final team has no end year)
+        self._career_timelines = {
+            'LeBron James': ([2010, 2014, 2018], ['CLE', 'MIA', 'CLE', 'LAL']),
+            'Kevin Durant': ([2016, 2019, 2022], ['OKC', 'GSW', 'BKN', 'PHX']),
+            'Shaquille O\'Neal': ([1996, 2004, 2008], ['ORL', 'LAL', 'MIA', 'PHX']),
+            'Dennis Rodman': ([1993], ['DET', 'CHI']),
+            'Charles Barkley': ([1992], ['PHI', 'PHX']),
+            'Clyde Drexler': ([1995], ['POR', 'HOU']),
+            'Russell Westbrook': ([2019, 2021, 2023], ['OKC', 'HOU', 'LAL', 'LAC']),
+            'James Harden': ([2012, 2020, 2022, 2024], ['OKC', 'HOU', 'BKN', 'PHI', 'LAC']),
+            'Chris Paul': ([2011, 2017, 2021, 2023], ['NOP', 'LAC', 'HOU', 'PHX', 'GSW']),
+            'Anthony Davis': ([2019], ['NOP', 'LAL']),
+            'Kawhi Leonard': ([2018, 2019], ['SAS', 'TOR', 'LAC']),
+            'Paul George': ([2017, 2019], ['IND', 'OKC', 'LAC']),
+            'Blake Griffin': ([2018], ['LAC', 'DET']),
+            'Kevin Garnett': ([2007], ['MIN', 'BOS']),
+            'Damian Lillard': ([2023], ['POR', 'MIL']),
+        }
+        
+        # Legendary players active in each generated year, looked up once per season
+        era_spans = {'1980s': (1980, 1989), '1990s': (1990, 1999), '2000s': (2000, 2009),
+                     '2010s': (2010, 2019), '2020s': (2020, 2025)}
+        self._era_by_year = {
+            year: [player for era, (first, last) in era_spans.items() if first <= year <= last
+                   for player in self.legendary_players[era]]
+            for year in range(start_year, end_year + 1)
+        }
+        
+        # Each year's legendary roster as (names, positions, team abbreviations, eras) columns, with
+        # teams resolved once here; players whose team isn't in that year's league are left out
+        self._legend_rosters_by_year = {}
+        for year in self._era_by_year:
+            teams_dict = self.get_teams_for_era(year)
+            roster = [(player['name'], player['position'], team_abbrev, player.get('era', ''))
+                      for player in self.get_players_for_era(year)
+                      for team_abbrev in [self._get_team_for_player(player['name'], player['teams'], year)]
+                      if team_abbrev in teams_dict]
+            self._legend_rosters_by_year[year] = tuple(zip(*roster)) or ((), (), (), ())
     
     def get_teams_for_era(self, year: int) -> Dict:
         """Get teams appropriate for the given year."""
@@ -164,417 +357,376 @@ class ComprehensiveNBAIngester:
     
     def get_players_for_era(self, year: int) -> List[Dict]:
         """Get players appropriate for the given year."""
-        players = []
-        
-        # Add legendary players for each era
-        if 1980 <= year <= 1989:
-            players.extend(self.legendary_players['1980s'])
-        if 1990 <= year <= 1999:
-            players.extend(self.legendary_players['1990s'])
-        if 2000 <= year <= 2009:
-            players.extend(self.legendary_players['2000s'])
-        if 2010 <= year <= 2019:
-            players.extend(self.legendary_players['2010s'])
-        if 2020 <= year <= 2025:
-            players.extend(self.legendary_players['2020s'])
-        
-        return players
+        return self._era_by_year.get(year, [])
     
-    def generate_comprehensive_data(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-        """Generate comprehensive NBA data for all seasons."""
+    def generate_comprehensive_data(
+        self, stats_sink: Optional[Callable[[Dict[str, List]], None]] = None, max_workers: int = 1
+    ) -> Tuple[pd.DataFrame, pd.DataFrame, Optional[pd.DataFrame]]:
+        """Generate comprehensive NBA data for all seasons.
+        
+        When stats_sink is given, each season's stats columns are handed to it as soon as they are
+        generated (e.g. StatsFileWriter.write_season) and no stats DataFrame is built or returned.
+        With max_workers > 1 the seasons are generated in that many worker processes.
+        """
         logger.info(f"🏀 Generating Comprehensive NBA Data ({self.start_year}-{self.end_year})")
         logger.info("=" * 70)
         
-        all_teams = []
-        all_players = []
-        all_stats = []
+        teams = {column: [] for column in TEAM_COLUMNS}
+        players = {column: [] for column in PLAYER_COLUMNS}
+        season_stats = []
+        stats_count = 0
         
-        team_id_counter = 1
-        player_id_counter = 1
+        # Seasons come back in order with ids local to the season; offsetting them by the
+        # records seen so far keeps team_id and player_id unique across the whole range
+        team_id_offset = 0
+        player_id_offset = 0
         
-        for season in self.seasons:
-            year = int(season.split('-')[0])
-            logger.info(f"Processing season {season}...")
-            
-            # Get teams for this era
-            teams_dict = self.get_teams_for_era(year)
-            
-            # Create teams for this season
-            for abbrev, team_info in teams_dict.items():
-                all_teams.append({
-                    'team_id': team_id_counter,
-                    'team_name': team_info['name'],
-                    'team_abbreviation': abbrev,
-                    'team_city': team_info['city'],
-                    'conference': team_info['conference'],
-                    'division': team_info['division'],
-                    'season': season
-                })
-                team_id_counter += 1
+        for season_data in self._iter_seasons(max_workers):
+            for columns in season_data:
+                columns['team_id'] = [team_id + team_id_offset for team_id in columns['team_id']]
+            for columns in (season_data.players, season_data.stats):
+                columns['player_id'] = [player_id + player_id_offset for player_id in columns['player_id']]
+            team_id_offset += len(season_data.teams['team_id'])
+            player_id_offset += len(season_data.players['player_id'])
             
-            # Get legendary players for this era
-            legendary_players = self.get_players_for_era(year)
+            for column in TEAM_COLUMNS:
+                teams[column].extend(season_data.teams[column])
+            for column in PLAYER_COLUMNS:
+                players[column].extend(season_data.players[column])
             
-            # Add legendary players
-            for player_info in legendary_players:
-                player_name = player_info['name']
-                position = player_info['position']
-                possible_teams = player_info['teams']
-                
-                # Choose team based on timeline and player history
-                team_abbrev = self._get_team_for_player(player_name, possible_teams, year)
-                
-                # Find team_id for this team in this season
-                team_id = None
-                for team in all_teams:
-                    if team['team_abbreviation'] == team_abbrev and team['season'] == season:
-                        team_id = team['team_id']
-                        break
-                
-                if team_id is None:
-                    continue
-                
-                # Create player record
-                all_players.append({
-                    'player_id': player_id_counter,
-                    'player_name': player_name,
-                    'team_id': team_id,
-                    'team_abbreviation': team_abbrev,
-                    'jersey_number': str(random.randint(0, 99)),
-                    'position': position,
-                    'height': f"{random.randint(6, 7)}-{random.randint(0, 11)}",
-                    'weight': str(random.randint(180, 280)),
-                    'age': random.randint(22, 38),
-                    'college': random.choice(['Duke', 'Kentucky', 'North Carolina', 'UCLA', 'Kansas', 'Michigan State']),
-                    'country': random.choice(['USA', 'Canada', 'France', 'Germany', 'Australia', 'Spain']),
-                    'draft_year': random.randint(max(1975, year-20), year),
-                    'draft_round': random.randint(1, 2),
-                    'draft_number': random.randint(1, 60),
-                    'season': season
-                })
-                
-                # Create realistic stats based on era and player
-                stats = self._generate_era_appropriate_stats(player_name, position, year, player_info.get('era', ''))
-                
-                all_stats.append({
-                    'player_id': player_id_counter,
-                    'player_name': player_name,
-                    'season': season,
-                    'team_id': team_id,
-                    'team_abbreviation': team_abbrev,
-                    'per_mode': 'PerGame',
-                    **stats
-                })
-                
-                player_id_counter += 1
-            
-            # Add additional random players each season
-            num_extra_players = random.randint(40, 80)
-            for i in range(num_extra_players):
-                first_names = ['Alex', 'Marcus', 'Devin', 'Tyler', 'Jordan', 'Mason', 'Logan', 'Ethan', 'Noah', 'Liam', 'James', 'Michael', 'David', 'Chris', 'Kevin']
-                last_names = ['Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez', 'Wilson', 'Smith', 'Anderson', 'Taylor', 'Thomas', 'Jackson']
-                
-                player_name = f"{random.choice(first_names)} {random.choice(last_names)}"
-                position = random.choice(['PG', 'SG', 'SF', 'PF', 'C'])
-                team_abbrev = random.choice(list(teams_dict.keys()))
-                
-                # Find team_id
-                team_id = None
-                for team in all_teams:
-                    if team['team_abbreviation'] == team_abbrev and team['season'] == season:
-                        team_id = team['team_id']
-                        break
-                
-                if team_id is None:
-                    continue
-                
-                # Create player record
-                all_players.append({
-                    'player_id': player_id_counter,
-                    'player_name': player_name,
-                    'team_id': team_id,
-                    'team_abbreviation': team_abbrev,
-                    'jersey_number': str(random.randint(0, 99)),
-                    'position': position,
-                    'height': f"{random.randint(6, 7)}-{random.randint(0, 11)}",
-                    'weight': str(random.randint(180, 280)),
-                    'age': random.randint(20, 35),
-                    'college': random.choice(['Duke', 'Kentucky', 'North Carolina', 'UCLA', 'Kansas', 'Michigan State']),
-                    'country': random.choice(['USA', 'Canada', 'France', 'Germany', 'Australia', 'Spain']),
-                    'draft_year': random.randint(max(1975, year-20), year),
-                    'draft_round': random.randint(1, 2),
-                    'draft_number': random.randint(1, 60),
-                    'season': season
-                })
-                
-                # Create stats
-                stats = self._generate_era_appropriate_stats(player_name, position, year, 'regular')
-                
-                all_stats.append({
-                    'player_id': player_id_counter,
-                    'player_name': player_name,
-                    'season': season,
-                    'team_id': team_id,
-                    'team_abbreviation': team_abbrev,
-                    'per_mode': 'PerGame',
-                    **stats
-                })
-                
-                player_id_counter += 1
-        
-        # Convert to DataFrames
-        teams_df = pd.DataFrame(all_teams).drop_duplicates(subset=['team_id', 'season'])
-        players_df = pd.DataFrame(all_players).drop_duplicates(subset=['player_id', 'season'])
-        stats_df = pd.DataFrame(all_stats)
+            stats_count += len(season_data.stats['player_id'])
+            if stats_sink is not None:
+                stats_sink(season_data.stats)
+            else:
+                season_stats.append(season_data.stats)
+        
+        # Convert to DataFrames; team_id and player_id are unique counters, so no de-duplication pass is needed,
+        # and every player row has exactly one stats row, in the same order
+        teams_df = _categorize(pd.DataFrame(teams))
+        players_df = _categorize(pd.DataFrame(players))
+        stats_df = None
+        if stats_sink is None:
+            stats_df = _categorize(pd.DataFrame({
+                column: [value for stats in season_stats for value in stats[column]]
+                for column in (season_stats[0] if season_stats else {})
+            }))
         
         logger.info(f"Generated {len(teams_df):,} team records")
         logger.info(f"Generated {len(players_df):,} player records")
-        logger.info(f"Generated {len(stats_df):,} stat records")
+        logger.info(f"Generated {stats_count:,} stat records")
         
         return teams_df, players_df, stats_df
     
+    def _iter_seasons(self, max_workers: int):
+        """Yield each season's generated columns in order, sequentially or from a process pool."""
+        if max_workers <= 1:
+            yield from map(self._load_or_generate_season, self.seasons)
+            return
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            yield from executor.map(self._load_or_generate_season, self.seasons)
+    
+    def _load_or_generate_season(self, season: str) -> SeasonData:
+        """Return a season from the on-disk season cache, generating and storing it on a miss."""
+        if self.season_cache_dir is None:
+            return self._generate_season(season)
+        
+        key = hashlib.sha256(f"{self.seed}-{season}-{source_hash()}".encode()).hexdigest()
+        path = os.path.join(self.season_cache_dir, f"{key}.pkl")
+        try:
+            with open(path, 'rb') as f:
+                return SeasonData(*pickle.load(f))
+        except (OSError, pickle.UnpicklingError, EOFError, TypeError):
+            pass
+        
+        season_data = self._generate_season(season)
+        
+        # Write then rename, so concurrent workers and interrupted runs never leave a partial entry
+        os.makedirs(self.season_cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(tuple(season_data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return season_data
+    
+    def _generate_season(self, season: str) -> SeasonData:
+        """Generate one season's team, player and stats columns, with ids starting at 1.
+        
+        Each season draws from its own generator derived from (seed, year), so results don't
+        depend on which process generates the season or in what order.
+        """
+        year = int(season.split('-')[0])
+        logger.info(f"Processing season {season}...")
+        rng = np.random.default_rng(None if self.seed is None else [self.seed, year])
+        
+        teams = {column: [] for column in TEAM_COLUMNS}
+        players = {column: [] for column in PLAYER_COLUMNS}
+        
+        # Get teams for this era
+        teams_dict = self.get_teams_for_era(year)
+        team_id_by_abbrev = {}
+        
+        # Create teams for this season
+        for abbrev, team_info in teams_dict.items():
+            team_id_by_abbrev[abbrev] = len(teams['team_id']) + 1
+            _append_row(
+                teams,
+                team_id=team_id_by_abbrev[abbrev],
+                team_name=team_info['name'],
+                team_abbreviation=abbrev,
+                team_city=team_info['city'],
+                conference=team_info['conference'],
+                division=team_info['division'],
+                season=season
+            )
+        
+        # Legendary players, pre-resolved for this year
+        legend_names, legend_positions, legend_teams, legend_eras = self._legend_rosters_by_year.get(
+            year, ((), (), (), ())
+        )
+        
+        # Add additional random players each season, drawing names, positions and teams in one batch
+        num_extra_players = int(rng.integers(40, 81))
+        first_names = _FIRST_NAMES_ARRAY[rng.integers(0, len(_FIRST_NAMES), num_extra_players)]
+        last_names = _LAST_NAMES_ARRAY[rng.integers(0, len(_LAST_NAMES), num_extra_players)]
+        player_names = np.char.add(np.char.add(first_names, ' '), last_names).tolist()
+        positions = rng.choice(_POSITIONS, num_extra_players).tolist()
+        team_abbrevs = rng.choice(
+            self._historical_abbrevs if year < 2000 else self._modern_abbrevs, num_extra_players
+        ).tolist()
+        
+        # Append legends then extras as whole columns
+        team_abbrevs = [*legend_teams, *team_abbrevs]
+        num_players = len(team_abbrevs)
+        players['player_id'].extend(range(1, num_players + 1))
+        players['player_name'].extend([*legend_names, *player_names])
+        players['team_id'].extend([team_id_by_abbrev[abbrev] for abbrev in team_abbrevs])
+        players['team_abbreviation'].extend(team_abbrevs)
+        players['position'].extend([*legend_positions, *positions])
+        players['season'].extend([season] * num_players)
+        
+        eras = [*legend_eras, *['regular'] * num_extra_players]
+        age_ranges = [(22, 38)] * len(legend_names) + [(20, 35)] * num_extra_players
+        
+        # Remaining player attributes for the whole season at once
+        self._append_season_attributes(players, age_ranges, year, rng)
+        
+        # Create realistic stats based on era and player, one vectorized batch per season
+        stats = self._generate_season_stats(players['player_name'], players['position'], eras, year, rng)
+        stats_columns = {
+            'player_id': list(players['player_id']),
+            'player_name': players['player_name'],
+            'season': players['season'],
+            'team_id': list(players['team_id']),
+            'team_abbreviation': players['team_abbreviation'],
+            'per_mode': ['PerGame'] * num_players,
+            **{column: values.tolist() for column, values in stats.items()}
+        }
+        
+        return SeasonData(teams, players, stats_columns)
+    
+    def _append_season_attributes(self, players: Dict[str, List], age_ranges: List[Tuple[int, int]], year: int,
+                                  rng: np.random.Generator):
+        """Generate the random biographical columns for a season's players in one batch."""
+        n = len(age_ranges)
+        age_bounds = np.array(age_ranges, dtype=np.int64).reshape(n, 2)
+        
+        feet = rng.integers(6, 8, n).astype(str)
+        inches = rng.integers(0, 12, n).astype(str)
+        
+        players['jersey_number'].extend(rng.integers(0, 100, n).astype(str).tolist())
+        players['height'].extend(np.char.add(np.char.add(feet, '-'), inches).tolist())
+        players['weight'].extend(rng.integers(180, 281, n).astype(str).tolist())
+        players['age'].extend(rng.integers(age_bounds[:, 0], age_bounds[:, 1] + 1).tolist())
+        players['college'].extend(rng.choice(_COLLEGES, n).tolist())
+        players['country'].extend(rng.choice(_COUNTRIES, n).tolist())
+        players['draft_year'].extend(rng.integers(max(1975, year-20), year + 1, n).tolist())
+        players['draft_round'].extend(rng.integers(1, 3, n).tolist())
+        players['draft_number'].extend(rng.integers(1, 61, n).tolist())
+    
     def _get_team_for_player(self, player_name: str, possible_teams: List[str], year: int) -> str:
         """Get the appropriate team for a player based on their career timeline."""
-        # Handle specific player team changes
-        if player_name == 'LeBron James':
-            if year <= 2010:
-                return 'CLE'
-            elif 2011 <= year <= 2014:
-                return 'MIA'
-            elif 2015 <= year <= 2018:
-                return 'CLE'
-            else:
-                return 'LAL'
-        elif player_name == 'Kevin Durant':
-            if year <= 2016:
-                return 'OKC'
-            elif 2017 <= year <= 2019:
-                return 'GSW'
-            elif 2020 <= year <= 2022:
-                return 'BKN'
-            else:
-                return 'PHX'
-        elif player_name == 'Shaquille O\'Neal':
-            if year <= 1996:
-                return 'ORL'
-            elif 1997 <= year <= 2004:
-                return 'LAL'
-            elif 2005 <= year <= 2008:
-                return 'MIA'
-            else:
-                return 'PHX'
-        elif player_name == 'Dennis Rodman':
-            if year <= 1993:
-                return 'DET'
-            else:
-                return 'CHI'
-        elif player_name == 'Charles Barkley':
-            if year <= 1992:
-                return 'PHI'
-            else:
-                return 'PHX'
-        elif player_name == 'Clyde Drexler':
-            if year <= 1995:
-                return 'POR'
-            else:
-                return 'HOU'
-        elif player_name == 'Russell Westbrook':
-            if year <= 2019:
-                return 'OKC'
-            elif 2020 <= year <= 2021:
-                return 'HOU'
-            elif 2022 <= year <= 2023:
-                return 'LAL'
-            else:
-                return 'LAC'
-        elif player_name == 'James Harden':
-            if year <= 2012:
-                return 'OKC'
-            elif 2013 <= year <= 2020:
-                return 'HOU'
-            elif 2021 <= year <= 2022:
-                return 'BKN'
-            elif 2023 <= year <= 2024:
-                return 'PHI'
-            else:
-                return 'LAC'
-        elif player_name == 'Chris Paul':
-            if year <= 2011:
-                return 'NOP'
-            elif 2012 <= year <= 2017:
-                return 'LAC'
-            elif 2018 <= year <= 2021:
-                return 'HOU'
-            elif 2022 <= year <= 2023:
-                return 'PHX'
-            else:
-                return 'GSW'
-        elif player_name == 'Anthony Davis':
-            if year <= 2019:
-                return 'NOP'
-            else:
-                return 'LAL'
-        elif player_name == 'Kawhi Leonard':
-            if year <= 2018:
-                return 'SAS'
-            elif year == 2019:
-                return 'TOR'
-            else:
-                return 'LAC'
-        elif player_name == 'Paul George':
-            if year <= 2017:
-                return 'IND'
-            elif 2018 <= year <= 2019:
-                return 'OKC'
-            else:
-                return 'LAC'
-        elif player_name == 'Blake Griffin':
-            if year <= 2018:
-                return 'LAC'
-            else:
-                return 'DET'
-        elif player_name == 'Kevin Garnett':
-            if year <= 2007:
-                return 'MIN'
-            else:
-                return 'BOS'
-        elif player_name == 'Damian Lillard':
-            if year <= 2023:
-                return 'POR'
-            else:
-                return 'MIL'
+        timeline = self._career_timelines.get(player_name)
+        if timeline is None:
+            # Default to first team in list
+            return possible_teams[0]
         
-        # Default to first team in list
-        return possible_teams[0]
+        last_years, teams = timeline
+        return teams[bisect_left(last_years, year)]
     
-    def _generate_era_appropriate_stats(self, player_name: str, position: str, year: int, era: str) -> Dict:
-        """Generate realistic stats based on era and player."""
-        
-        # Base stats by position
-        position_bases = {
-            'PG': {'points': 12, 'assists': 6, 'rebounds': 3, 'steals': 1.2},
-            'SG': {'points': 14, 'assists': 3, 'rebounds': 4, 'steals': 1.0},
-            'SF': {'points': 13, 'assists': 3, 'rebounds': 5, 'steals': 1.1},
-            'PF': {'points': 12, 'assists': 2, 'rebounds': 7, 'blocks': 0.8},
-            'C': {'points': 11, 'assists': 1, 'rebounds': 8, 'blocks': 1.2}
-        }
+    def _generate_season_stats(self, player_names: List[str], positions: List[str], eras: List[str],
+                               year: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """Generate realistic stats for a whole season's players at once, based on era and player."""
+        n = len(player_names)
         
-        base = position_bases.get(position, position_bases['SF'])
+        # Integer codes into the lookup tables; unknown positions play as SF, unknown eras as regular
+        pos = np.array([POSITION_CODES.get(p, POSITION_CODES['SF']) for p in positions], dtype=np.intp)
+        era = np.array([ERA_CODES.get(e, ERA_CODES['regular']) for e in eras], dtype=np.intp)
+        tier = np.array([SUPERSTAR_TIERS.get(name, 0) for name in player_names], dtype=np.intp)
         
         # Era adjustments
-        era_multipliers = {
-            '1980s': {'points': 0.9, 'assists': 1.1, 'rebounds': 1.0, 'three_pct': 0.3},
-            '1990s': {'points': 1.0, 'assists': 1.0, 'rebounds': 1.0, 'three_pct': 0.4},
-            '2000s': {'points': 1.0, 'assists': 1.0, 'rebounds': 1.0, 'three_pct': 0.5},
-            '2010s': {'points': 1.1, 'assists': 1.0, 'rebounds': 0.95, 'three_pct': 0.7},
-            '2020s': {'points': 1.2, 'assists': 1.1, 'rebounds': 0.9, 'three_pct': 0.8},
-            'regular': {'points': 1.0, 'assists': 1.0, 'rebounds': 1.0, 'three_pct': 0.5}
-        }
-        
-        era_mult = era_multipliers.get(era, era_multipliers['regular'])
+        era_points = ERA_POINTS[era]
+        era_three_pct = ERA_THREE_PCT[era]
         
         # Adjust for modern NBA (2020s have higher scoring)
         if year >= 2020:
-            era_mult['points'] *= 1.2
-            era_mult['three_pct'] = 0.8
-        
-        # Superstar adjustments
-        if player_name in ['Michael Jordan', 'LeBron James', 'Kobe Bryant', 'Kevin Durant', 'Giannis Antetokounmpo', 'Luka Doncic']:
-            base['points'] *= 2.0
-            base['assists'] *= 1.5
-            base['rebounds'] *= 1.3
-        elif player_name in ['Magic Johnson', 'Stephen Curry', 'Damian Lillard', 'Trae Young']:
-            base['assists'] *= 2.0
-            base['points'] *= 1.7
-        elif player_name in ['Shaquille O\'Neal', 'Hakeem Olajuwon', 'David Robinson', 'Nikola Jokic', 'Joel Embiid']:
-            base['rebounds'] *= 1.6
-            base['blocks'] = base.get('blocks', 0) * 2.5
-            base['points'] *= 1.5
-        elif player_name in ['Dennis Rodman', 'Ben Wallace']:
-            base['rebounds'] *= 2.5
-            base['points'] *= 0.7
+            era_points = era_points * 1.2
+            era_three_pct = np.full(n, 0.8)
+        
+        # Base stats by position with superstar adjustments
+        base_points = BASE_POINTS[pos] * TIER_POINTS[tier]
+        base_assists = BASE_ASSISTS[pos] * TIER_ASSISTS[tier]
+        base_rebounds = BASE_REBOUNDS[pos] * TIER_REBOUNDS[tier]
+        base_blocks = np.where(tier == 3, LISTED_BLOCKS[pos] * 2.5, BASE_BLOCKS[pos])
         
         # Generate stats
-        games_played = random.randint(65, 82)
+        games_played = rng.integers(65, 83, n)
         
-        points = max(0.1, base['points'] * era_mult['points'] * random.uniform(0.8, 1.4))
-        assists = max(0.1, base['assists'] * era_mult['assists'] * random.uniform(0.7, 1.4))
-        rebounds = max(0.1, base['rebounds'] * era_mult['rebounds'] * random.uniform(0.8, 1.3))
+        points = np.maximum(0.1, base_points * era_points * rng.uniform(0.8, 1.4, n))
+        assists = np.maximum(0.1, base_assists * ERA_ASSISTS[era] * rng.uniform(0.7, 1.4, n))
+        rebounds = np.maximum(0.1, base_rebounds * ERA_REBOUNDS[era] * rng.uniform(0.8, 1.3, n))
         
         # Era-appropriate shooting percentages
-        fg_pct = random.uniform(0.40, 0.55)
-        three_pct = random.uniform(0.25, 0.45) * era_mult['three_pct']
-        ft_pct = random.uniform(0.70, 0.90)
+        fg_pct = rng.uniform(0.40, 0.55, n)
+        three_pct = rng.uniform(0.25, 0.45, n) * era_three_pct
+        ft_pct = rng.uniform(0.70, 0.90, n)
         
         return {
             'games_played': games_played,
-            'games_started': random.randint(games_played // 2, games_played),
-            'minutes_per_game': round(random.uniform(25, 40), 1),
-            'field_goals_made': round(points * 0.38, 1),
-            'field_goals_attempted': round((points * 0.38) / fg_pct, 1),
-            'field_goal_percentage': round(fg_pct, 3),
-            'three_pointers_made': round(points * 0.15, 1),
-            'three_pointers_attempted': round((points * 0.15) / three_pct, 1),
-            'three_point_percentage': round(three_pct, 3),
-            'free_throws_made': round(points * 0.22, 1),
-            'free_throws_attempted': round((points * 0.22) / ft_pct, 1),
-            'free_throw_percentage': round(ft_pct, 3),
-            'offensive_rebounds': round(rebounds * 0.25, 1),
-            'defensive_rebounds': round(rebounds * 0.75, 1),
-            'total_rebounds': round(rebounds, 1),
-            'assists': round(assists, 1),
-            'steals': round(base.get('steals', 1.0) * random.uniform(0.6, 1.4), 1),
-            'blocks': round(base.get('blocks', 0.5) * random.uniform(0.4, 2.2), 1),
-            'turnovers': round(random.uniform(1.8, 4.2), 1),
-            'personal_fouls': round(random.uniform(1.8, 3.8), 1),
-            'points': round(points, 1)
+            'games_started': rng.integers(games_played // 2, games_played + 1),
+            'minutes_per_game': np.round(rng.uniform(25, 40, n), 1),
+            'field_goals_made': np.round(points * 0.38, 1),
+            'field_goals_attempted': np.round((points * 0.38) / fg_pct, 1),
+            'field_goal_percentage': np.round(fg_pct, 3),
+            'three_pointers_made': np.round(points * 0.15, 1),
+            'three_pointers_attempted': np.round((points * 0.15) / three_pct, 1),
+            'three_point_percentage': np.round(three_pct, 3),
+            'free_throws_made': np.round(points * 0.22, 1),
+            'free_throws_attempted': np.round((points * 0.22) / ft_pct, 1),
+            'free_throw_percentage': np.round(ft_pct, 3),
+            'offensive_rebounds': np.round(rebounds * 0.25, 1),
+            'defensive_rebounds': np.round(rebounds * 0.75, 1),
+            'total_rebounds': np.round(rebounds, 1),
+            'assists': np.round(assists, 1),
+            'steals': np.round(BASE_STEALS[pos] * rng.uniform(0.6, 1.4, n), 1),
+            'blocks': np.round(base_blocks * rng.uniform(0.4, 2.2, n), 1),
+            'turnovers': np.round(rng.uniform(1.8, 4.2, n), 1),
+            'personal_fouls': np.round(rng.uniform(1.8, 3.8, n), 1),
+            'points': np.round(points, 1)
         }
     
-    def save_data(self, teams_df: pd.DataFrame, players_df: pd.DataFrame, stats_df: pd.DataFrame):
-        """Save data to CSV files."""
-        logger.info("Saving comprehensive NBA data to CSV files...")
+    @staticmethod
+    def _link_or_copy(src: str, dst: str):
+        """Hard-link src to dst, falling back to a file copy across filesystems."""
+        if os.path.lexists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+    
+    @staticmethod
+    def _gzip_copy(src: str, dst: str):
+        """Gzip src into dst at level 1, where compression costs little next to the bytes saved."""
+        # A fixed header mtime keeps the output byte-identical for identical input
+        with open(src, 'rb') as f_in, gzip.GzipFile(dst, 'wb', compresslevel=1, mtime=0) as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+    
+    @staticmethod
+    def _write_csv(df: pd.DataFrame, path: str):
+        """Write a DataFrame to CSV with pyarrow's C++ writer, matching StatsFileWriter's output."""
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+    
+    def save_data(self, teams_df: pd.DataFrame, players_df: pd.DataFrame, stats_df: Optional[pd.DataFrame] = None,
+                  gzip_postgres_ready: bool = False) -> List[str]:
+        """Save data to CSV and Parquet files; stats_df may be omitted when it was already streamed to data/.
+        
+        Returns the paths written to data/postgres_ready, gzipped (.csv.gz) when gzip_postgres_ready is set.
+        """
+        logger.info("Saving comprehensive NBA data to CSV and Parquet files...")
         
         # Save to main data directory
-        teams_df.to_csv('data/teams_all_seasons.csv', index=False)
-        players_df.to_csv('data/players_all_seasons.csv', index=False)
-        stats_df.to_csv('data/player_season_stats.csv', index=False)
+        self._write_csv(teams_df, 'data/teams_all_seasons.csv')
+        self._write_csv(players_df, 'data/players_all_seasons.csv')
+        if stats_df is not None:
+            self._write_csv(stats_df, 'data/player_season_stats.csv')
+        
+        # Typed, compressed working copies for analysis (faster to read back than CSV)
+        teams_df.to_parquet('data/teams_all_seasons.parquet', compression='snappy', index=False)
+        players_df.to_parquet('data/players_all_seasons.parquet', compression='snappy', index=False)
+        if stats_df is not None:
+            stats_df.to_parquet('data/player_season_stats.parquet', compression='snappy', index=False)
         
         logger.info(f"✅ Saved {len(teams_df):,} team records")
         logger.info(f"✅ Saved {len(players_df):,} player records")
-        logger.info(f"✅ Saved {len(stats_df):,} stat records")
+        if stats_df is not None:
+            logger.info(f"✅ Saved {len(stats_df):,} stat records")
         
-        # Create postgres_ready directory for database loading
+        # Create postgres_ready directory for database loading; the files are identical,
+        # so link (or copy) them at the filesystem level instead of serializing again,
+        # or compress them when the handoff goes over slow disks or network storage
         os.makedirs('data/postgres_ready', exist_ok=True)
-        teams_df.to_csv('data/postgres_ready/teams_all_seasons.csv', index=False)
-        players_df.to_csv('data/postgres_ready/players_all_seasons.csv', index=False)
-        stats_df.to_csv('data/postgres_ready/player_season_stats.csv', index=False)
+        postgres_ready_paths = []
+        for filename in POSTGRES_READY_FILES:
+            src = os.path.join('data', filename)
+            dst = os.path.join('data/postgres_ready', filename)
+            stale = dst if gzip_postgres_ready else f"{dst}.gz"
+            if os.path.lexists(stale):
+                os.remove(stale)
+            
+            if gzip_postgres_ready:
+                dst = f"{dst}.gz"
+                self._gzip_copy(src, dst)
+            else:
+                self._link_or_copy(src, dst)
+            postgres_ready_paths.append(dst)
         
         logger.info("📁 Files created:")
         logger.info("  - data/teams_all_seasons.csv")
         logger.info("  - data/players_all_seasons.csv")
         logger.info("  - data/player_season_stats.csv")
+        logger.info("  - data/*.parquet (typed working copies)")
         logger.info("  - data/postgres_ready/ (for database loading)")
+        
+        return postgres_ready_paths
 
 def main():
     """Main function to generate comprehensive NBA data."""
     # Allow filtering via environment variables
-    start_year = int(os.getenv('START_YEAR', 1980))
-    end_year = int(os.getenv('END_YEAR', 2025))
+    settings = env_settings()
+    start_year, end_year = settings['start_year'], settings['end_year']
+    seed, workers = settings['seed'], settings['workers']
+    gzip_postgres_ready = settings['gzip_postgres_ready']
     
     logger.info(f"🏀 NBA Data Generation ({start_year}-{end_year})")
     logger.info("=" * 60)
     
+    # Outputs from an identical earlier seeded run (same years, seed and code) are reused as-is
+    if outputs_up_to_date(settings):
+        logger.info(f"♻️  Outputs for {start_year}-{end_year} with seed {seed} are up to date; skipping generation")
+        return
+    
     # Create ingester
-    ingester = ComprehensiveNBAIngester(start_year=start_year, end_year=end_year)
+    ingester = ComprehensiveNBAIngester(
+        start_year=start_year, end_year=end_year, seed=seed, season_cache_dir=os.path.join(cache_dir(), 'seasons')
+    )
     
-    # Generate comprehensive data
-    teams_df, players_df, stats_df = ingester.generate_comprehensive_data()
+    # Generate comprehensive data, streaming stats to disk season by season
+    with StatsFileWriter('data/player_season_stats') as stats_writer:
+        teams_df, players_df, _ = ingester.generate_comprehensive_data(
+            stats_sink=stats_writer.write_season, max_workers=workers
+        )
     
     # Save data
-    ingester.save_data(teams_df, players_df, stats_df)
+    postgres_ready_paths = ingester.save_data(teams_df, players_df, gzip_postgres_ready=gzip_postgres_ready)
+    if seed is not None:
+        write_output_manifest(
+            output_manifest_path(start_year, end_year, seed, gzip_postgres_ready),
+            [*OUTPUT_FILES, *postgres_ready_paths]
+        )
     
     logger.info("🎉 Comprehensive NBA data generation completed!")
-    logger.info(f"📊 Total records generated: {len(teams_df) + len(players_df) + len(stats_df):,}")
+    logger.info(f"📊 Total records generated: {len(teams_df) + len(players_df) + stats_writer.rows_written:,}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,87 @@
+"""
+Output Cache Helpers for NBA Data Generation
+
+Generation settings and the manifest that records an identical seeded run's outputs,
+kept free of pandas/numpy so the pipeline can check them without importing nba_ingest.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Cache paths are anchored here rather than to the caller's working directory
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Generation code whose changes invalidate cached outputs and seasons
+INGEST_SOURCE = os.path.join(PROJECT_DIR, 'nba_ingest.py')
+
+@lru_cache(maxsize=None)
+def source_hash() -> str:
+    """sha256 of nba_ingest's source, so cached outputs are invalidated by code changes."""
+    with open(INGEST_SOURCE, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def cache_dir() -> str:
+    """Cache directory from PIPELINE_CACHE_DIR (default data/.cache), relative to the project directory."""
+    return os.path.join(PROJECT_DIR, os.getenv('PIPELINE_CACHE_DIR', os.path.join('data', '.cache')))
+
+def output_manifest_path(start_year: int, end_year: int, seed: Optional[int], gzip_postgres_ready: bool,
+                         data_dir: str = 'data') -> str:
+    """Manifest path keyed on the generation inputs, the absolute output directory and nba_ingest's source."""
+    key = hashlib.sha256(
+        f"{start_year}-{end_year}-{seed}-{gzip_postgres_ready}-{os.path.abspath(data_dir)}-{source_hash()}".encode()
+    ).hexdigest()
+    return os.path.join(cache_dir(), f"{key}.manifest")
+
+def _outputs_match_manifest(manifest_path: str) -> bool:
+    """True if every output listed in the manifest still exists with the recorded size and mtime."""
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        return all(
+            (st := os.stat(path)).st_size == entry['size'] and st.st_mtime_ns == entry['mtime_ns']
+            for path, entry in manifest['files'].items()
+        )
+    except (OSError, ValueError, KeyError):
+        return False
+
+def write_output_manifest(manifest_path: str, paths: List[str]):
+    """Record the size and mtime of every output file produced by this run, by absolute path."""
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    files = {}
+    for path in map(os.path.abspath, paths):
+        st = os.stat(path)
+        files[path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    with open(manifest_path, 'w') as f:
+        json.dump({'created_at': datetime.now().isoformat(), 'files': files}, f, indent=2)
+
+# Values that turn a boolean environment variable on; anything else (including "0") leaves it off
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+def env_flag(name: str) -> bool:
+    """True if the environment variable is set to one of TRUE_VALUES (case-insensitive)."""
+    return os.getenv(name, '').strip().lower() in TRUE_VALUES
+
+def env_settings() -> Dict[str, Optional[int]]:
+    """Generation settings from START_YEAR, END_YEAR, SEED, WORKERS and POSTGRES_READY_GZIP environment variables."""
+    return {
+        'start_year': int(os.getenv('START_YEAR', 1980)),
+        'end_year': int(os.getenv('END_YEAR', 2025)),
+        'seed': int(os.environ['SEED']) if os.getenv('SEED') else None,
+        'workers': int(os.getenv('WORKERS', 1)),
+        'gzip_postgres_ready': env_flag('POSTGRES_READY_GZIP'),
+    }
+
+def outputs_up_to_date(settings: Dict[str, Optional[int]], data_dir: str = 'data') -> bool:
+    """True if an earlier seeded run with these settings and this code left its outputs in data_dir untouched.
+    
+    Unseeded runs are meant to produce fresh random data, so they are never considered up to date.
+    """
+    if settings['seed'] is None or env_flag('FORCE_REGENERATE'):
+        return False
+    return _outputs_match_manifest(output_manifest_path(
+        settings['start_year'], settings['end_year'], settings['seed'], settings['gzip_postgres_ready'], data_dir
+    ))
@@ -8,87 +8,206 @@ import os
 import sys
 import subprocess
 import logging
+import logging.handlers
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-# Set up logging
+# Child steps run from the script's directory, whatever the caller's working directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Set up logging; file records are buffered in memory and written in batches of 1024,
+# immediately on errors, and at interpreter exit (logging.shutdown flushes the buffer)
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_log_file_handler = logging.FileHandler('nba_pipeline.log', delay=True)
+_log_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('nba_pipeline.log'),
+        logging.handlers.MemoryHandler(1024, flushLevel=logging.ERROR, target=_log_file_handler),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
-def run_command(command, description):
-    """Run a command and log the result."""
+# Imported once logging is configured, so the loader's messages land in the pipeline log too;
+# nba_ingest (pandas, numpy, pyarrow) is only imported by the in-process --stream path
+from database_loader import NBADatabaseLoader
+from output_cache import env_settings, outputs_up_to_date
+
+# Child steps still running, so an aborting pipeline can stop them instead of waiting on them
+_child_processes = set()
+_child_processes_lock = threading.Lock()
+_aborting = threading.Event()
+
+def terminate_child_processes():
+    """Terminate every running child step; steps that have not started yet are refused."""
+    with _child_processes_lock:
+        _aborting.set()
+        for process in _child_processes:
+            process.terminate()
+
+def run_command(argv, description):
+    """Run a command (an argv list, no shell), streaming its output to the log as it is produced."""
     logger.info(f"🔄 {description}...")
     
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__))
-        )
+        with _child_processes_lock:
+            if _aborting.is_set():
+                logger.error(f"❌ {description} skipped: pipeline is aborting")
+                return False
+            # stderr is merged into stdout and read line by line, so memory stays flat however much the child logs
+            process = subprocess.Popen(
+                argv,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                env={**os.environ, 'PYTHONUNBUFFERED': '1'},
+                cwd=SCRIPT_DIR
+            )
+            _child_processes.add(process)
         
-        if result.returncode == 0:
+        try:
+            with process:
+                for line in process.stdout:
+                    logger.info(f"[{description}] {line.rstrip()}")
+                returncode = process.wait()
+        finally:
+            with _child_processes_lock:
+                _child_processes.discard(process)
+        
+        if returncode == 0:
             logger.info(f"✅ {description} completed successfully")
-            if result.stdout:
-                logger.info(f"Output: {result.stdout}")
             return True
         else:
-            logger.error(f"❌ {description} failed")
-            if result.stderr:
-                logger.error(f"Error: {result.stderr}")
+            logger.error(f"❌ {description} failed (exit code {returncode})")
             return False
             
     except Exception as e:
         logger.error(f"❌ Error running {description}: {e}")
         return False
 
-def main():
-    """Run the complete NBA data pipeline."""
+# Wall time per pipeline step, in seconds, filled in by timed()
+step_timings = {}
+
+def timed(step, func, *args):
+    """Call func(*args), recording and logging how long it took under the given step name."""
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        step_timings[step] = time.perf_counter() - start
+        logger.info(f"⏱️  {step}: {step_timings[step]:.2f}s")
+
+def log_step_timings():
+    """Log the per-step timings collected so far, to show which step dominates."""
+    logger.info("⏱️  Step timings: " + ", ".join(f"{step}={seconds:.2f}s" for step, seconds in step_timings.items()))
+
+def run_file_based_steps():
+    """Run steps 1-3 through the CSV files; returns the step 1 loader, or None on failure."""
+    # Steps 1 and 2 don't depend on each other, so the connection test runs while data is generated;
+    # the table loads themselves already run concurrently inside database_loader.py
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Step 1: Test database connection, in-process; the connection is kept for verification
+        logger.info("Step 1: Testing database connection...")
+        loader = NBADatabaseLoader()
+        connection_test = executor.submit(timed, 'connect', loader.connect)
+        
+        # Step 2: Collect NBA data, unless the outputs from an identical run are still in place
+        logger.info("Step 2: Collecting NBA data...")
+        if outputs_up_to_date(env_settings(), data_dir=os.path.join(SCRIPT_DIR, 'data')):
+            logger.info("♻️  Generated data is up to date; skipping NBA data collection")
+            data_collection = executor.submit(lambda: True)
+        else:
+            data_collection = executor.submit(
+                timed, 'ingest', run_command, [sys.executable, "-u", "nba_ingest.py"], "NBA data collection"
+            )
+        
+        # Fail fast: whichever step fails first stops the other instead of waiting for it
+        failures = {connection_test: "Database connection failed", data_collection: "Data collection failed"}
+        failed = False
+        for future in as_completed(failures):
+            if not future.result():
+                logger.error(f"{failures[future]}. Exiting.")
+                terminate_child_processes()
+                failed = True
+                break
+    
+    if failed:
+        loader.close()
+        return None
+    
+    # Step 3: Load data into PostgreSQL (COPY FROM STDIN of the postgres_ready CSVs)
+    logger.info("Step 3: Loading data into PostgreSQL...")
+    if not timed('load', run_command, [sys.executable, "-u", "database_loader.py", "data/postgres_ready"], "Database loading"):
+        loader.close()
+        logger.error("Database loading failed. Exiting.")
+        return None
+    
+    return loader
+
+def stream_generated_data():
+    """Generate NBA data and COPY it into PostgreSQL in-process, without intermediate CSV files."""
+    from nba_ingest import ComprehensiveNBAIngester
+    
+    settings = env_settings()
+    ingester = ComprehensiveNBAIngester(
+        start_year=settings['start_year'], end_year=settings['end_year'], seed=settings['seed']
+    )
+    return NBADatabaseLoader().load_generated_data(ingester, clear_existing=True, max_workers=settings['workers'])
+
+def main(stream: bool = False):
+    """Run the complete NBA data pipeline.
+    
+    With stream=True (--stream), steps 2 and 3 run in-process and the generated data is
+    copied straight into PostgreSQL instead of going through data/postgres_ready.
+    """
     logger.info("🏀 NBA Complete Data Pipeline Started")
     logger.info("=" * 50)
     
     start_time = datetime.now()
     
-    # Step 1: Test database connection
-    logger.info("Step 1: Testing database connection...")
-    if not run_command("python3 -c \"from database_loader import NBADatabaseLoader; loader = NBADatabaseLoader(); print('✅ Database connection successful!' if loader.connect() else '❌ Database connection failed!')\"", "Database connection test"):
-        logger.error("Database connection failed. Exiting.")
-        return False
-    
-    # Step 2: Collect NBA data
-    logger.info("Step 2: Collecting NBA data...")
-    if not run_command("python3 nba_ingest.py", "NBA data collection"):
-        logger.error("Data collection failed. Exiting.")
-        return False
-    
-    # Step 3: Load data into PostgreSQL
-    logger.info("Step 3: Loading data into PostgreSQL...")
-    if not run_command("python3 database_loader.py", "Database loading"):
-        logger.error("Database loading failed. Exiting.")
-        return False
+    if stream:
+        # Step 1: Test database connection; the connection is kept for verification
+        logger.info("Step 1: Testing database connection...")
+        loader = NBADatabaseLoader()
+        if not timed('connect', loader.connect):
+            logger.error("Database connection failed. Exiting.")
+            return False
+        
+        # Steps 2 and 3: Generate NBA data and stream it into PostgreSQL
+        logger.info("Steps 2-3: Generating NBA data and streaming it into PostgreSQL...")
+        if not timed('ingest+load', stream_generated_data):
+            loader.close()
+            log_step_timings()
+            logger.error("Streaming load failed. Exiting.")
+            return False
+    else:
+        loader = run_file_based_steps()
+        if loader is None:
+            log_step_timings()
+            return False
     
-    # Step 4: Verify data
+    # Step 4: Verify data on the connection opened in step 1
     logger.info("Step 4: Verifying loaded data...")
-    if not run_command("python3 -c \"from database_loader import NBADatabaseLoader; loader = NBADatabaseLoader(); loader.connect(); loader.get_table_counts()\"", "Data verification"):
+    if not timed('verify', loader.get_table_counts):
         logger.warning("Data verification failed, but data may still be loaded correctly.")
+    loader.close()
     
     end_time = datetime.now()
     duration = end_time - start_time
     
     logger.info("🎉 NBA Data Pipeline Completed Successfully!")
     logger.info(f"⏱️  Total time: {duration}")
+    log_step_timings()
     logger.info("📊 Data is now available in your PostgreSQL database")
     logger.info("🔍 You can query the data using the 'nba' schema")
     
     return True
 
 if __name__ == "__main__":
-    success = main()
+    success = main(stream='--stream' in sys.argv[1:])
     sys.exit(0 if success else 1)